@@ -7,6 +7,10 @@ import sys
 
 import x7zipfile
 
+# attribute column indexed by is_dir() | is_readonly() << 1 | is_file() << 2
+_MODES = ('.....', 'D....', '.R...', 'DR...', '....A', 'D...A', '.R..A', 'DR..A')
+_WRITE_BUFSIZE = 65536
+
 
 def main():
     parser = argparse.ArgumentParser(prog='x7zipfile')
@@ -38,50 +42,43 @@ def main():
             total_file_size = 0
             file_count = 0
             folder_count = 0
-            nofilter = len(options.file_names) == 0
-            members = set(options.file_names)
+            members = set(options.file_names) if options.file_names else None
 
+            rows = []
+            rows_length = 0
             for info in zipfile.infolist():
-                total_compress_size += info.compress_size or 0
-
-                if not nofilter and info.filename not in members:
+                if members is not None and info.filename not in members:
                     continue
 
+                total_file_size += info.file_size or 0
+                total_compress_size += info.compress_size or 0
+
                 date_time = info.date_time
                 if date_time is None:
-                    print(' '*19, end=' ')
+                    date = ' '*19
                 else:
-                    print(f'{date_time[0]:04}-{date_time[1]:02}-{date_time[2]:02} {date_time[3]:02}:{date_time[4]:02}:{date_time[5]:02}', end=' ')
-
-                mode = ['.', '.', '.', '.', '.', ]
-                if info.is_dir():
-                    mode[0] = 'D'
-                    folder_count += 1
-
-                if info.is_readonly():
-                    mode[1] = 'R'
-
-                if info.is_file():
-                    mode[4] = 'A'
-                    file_count += 1
+                    date = f'{date_time[0]:04}-{date_time[1]:02}-{date_time[2]:02} {date_time[3]:02}:{date_time[4]:02}:{date_time[5]:02}'
 
-                print(''.join(mode), end=' ')
+                is_dir = info.is_dir()
+                is_file = info.is_file()
+                folder_count += is_dir
+                file_count += is_file
+                mode = _MODES[is_dir | info.is_readonly() << 1 | is_file << 2]
 
-                print(str(info.file_size).rjust(12), end=' ')
-                print((str(info.compress_size) if info.compress_size is not None else '').rjust(12), end='  ')
-                print(info.filename)
+                compress_size = info.compress_size if info.compress_size is not None else ''
+                row = f'{date} {mode} {info.file_size!s:>12} {compress_size!s:>12}  {info.filename}\n'
+                rows.append(row)
+                rows_length += len(row)
+                if rows_length >= _WRITE_BUFSIZE:
+                    sys.stdout.write(''.join(rows))
+                    rows.clear()
+                    rows_length = 0
 
-                total_file_size += info.file_size
+            sys.stdout.write(''.join(rows))
 
             print('------------------- ----- ------------ ------------  ------------------------')
-            print(' '*19, end=' ')
-            print(' '*5, end=' ')
-            print(str(total_file_size).rjust(12), end=' ')
-            print(str(total_compress_size).rjust(12), end='  ')
-            print(f'{file_count} files', end='')
-            if folder_count > 0:
-                print(f', {folder_count} folders', end='')
-            print()
+            folders = f', {folder_count} folders' if folder_count > 0 else ''
+            print(f'{"":19} {"":5} {total_file_size:>12} {total_compress_size:>12}  {file_count} files{folders}')
 
     elif options.command == 'x':
         with x7zipfile.x7ZipFile(options.archive_name.name) as zipfile:
@@ -29,17 +29,23 @@
 # OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import codecs
 import datetime
 import errno
 import os
 import re
+import shutil
 import subprocess
 import sys
+import threading
 from dataclasses import dataclass
-from typing import Callable, Iterator, List, Tuple, Union
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Tuple, Union
 
 _WIN32 = sys.platform == "win32"
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
 _EXECUTABLES = ['7z'] + (['7z.exe'] if _WIN32 else [])
+_STDOUT_BUFSIZE = 262144
+_DATE_TIME_SEPARATOR = re.compile(r'[ \-:]')
 
 
 class x7ZipError(Exception):
@@ -58,7 +64,7 @@ class x7ZipCannotExec(x7ZipExecError):
     """Executable not found."""
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class x7ZipInfo:
     """An entry in 7-zip archive.
 
@@ -145,22 +151,12 @@ class _Executor:
     def __init__(self, executable: str):
         self.executable = executable
 
-    def is_available(self) -> bool:
-        try:
-            p = self._popen(self.executable)
-            _, _ = p.communicate(timeout=1)
-            p.wait()
-            return p.returncode == 0
-        except:
-            return False
-
     def _popen(self, command: Union[str, List[str]]) -> subprocess.Popen:
         """Disconnect command from parent fds, read only from stdout.
         """
         try:
             return subprocess.Popen(
                 command,
-                bufsize=0,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 stdin=subprocess.DEVNULL,
@@ -174,24 +170,53 @@ class _Executor:
             raise
 
     def execute(self, command: Union[str, List[str]]) -> Iterator[str]:
-        linesep = os.linesep
         p = self._popen(command)
-        while True:
-            line = p.stdout.readline()
-            if line is not None:
-                yield line.decode('utf-8').rstrip(linesep)
 
-            if not line and p.poll() is not None:
-                break
+        # drain stderr concurrently so that a chatty 7-zip cannot block on a full pipe
+        error_messages = []
+        error_reader = threading.Thread(target=lambda: error_messages.append(p.stderr.read()), daemon=True)
+        error_reader.start()
 
-        exit_code = p.poll()
-        error_message = p.stderr.read().decode('utf-8').strip()
+        try:
+            # read1 returns whatever is already available, the decoder keeps
+            # line endings untranslated, '\r' is a valid character in file names
+            decoder = codecs.getincrementaldecoder('utf-8')('strict')
+            linesep = os.linesep
+
+            buffer = ''
+            while True:
+                chunk = p.stdout.read1(_STDOUT_BUFSIZE)
+                if not chunk:
+                    break
 
-        for stream in [p.stdin, p.stdout, p.stderr]:
-            try:
-                stream.close()
-            except:
-                pass
+                buffer += decoder.decode(chunk)
+                end = buffer.rfind(linesep)
+                if end < 0:
+                    continue
+
+                yield from buffer[:end].split(linesep)
+                buffer = buffer[end + len(linesep):]
+
+            buffer += decoder.decode(b'', final=True)
+            if buffer:
+                yield buffer
+
+            exit_code = p.wait()
+        finally:
+            # the caller may stop early, do not leave 7-zip running unreaped
+            if p.poll() is None:
+                p.kill()
+                p.wait()
+
+            error_reader.join()
+
+            for stream in [p.stdin, p.stdout, p.stderr]:
+                try:
+                    stream.close()
+                except:
+                    pass
+
+        error_message = b''.join(error_messages).decode('utf-8', errors='replace').strip()
 
         if exit_code == 0:
             return
@@ -209,61 +234,66 @@ class _Executor:
         else:
             raise x7ZipExecError(error_message)
 
-    _parsers: Tuple[str, int, Callable[[str], str]] = [
-        (
-            param[0],
-            param[1],
-            param[2],
-            len(param[0]),
-        )
-        for param in [
-            ('Path = ', 'filename', lambda p: p),
-            ('Size = ', 'file_size', lambda p: int(p) if p else None),
-            ('Packed Size = ', 'compress_size', lambda p: int(p) if p else None),
-            ('Modified = ', 'date_time', lambda p: tuple([int(v) for v in re.split(r'[ \-:]', p)]) if p else None),
-            ('Attributes = ', 'mode', lambda p: p),
-            ('CRC = ', 'CRC', lambda p: int(p, 16) if p else None),
-            ('Encrypted = ', 'encrypted', lambda p: p),
-            ('Method = ', 'compress_type', lambda p: p if p else None),
-            ('Block = ', 'block', lambda p: int(p) if p else None),
-        ]
-    ]
+    _parsers: Dict[str, Tuple[str, Callable[[str], Any]]] = {
+        # only a marker, compared by identity: execute_list opens a record on it without parsing
+        'Path': ('filename', lambda p: p),
+        'Size': ('file_size', lambda p: int(p) if p else None),
+        'Packed Size': ('compress_size', lambda p: int(p) if p else None),
+        'Modified': ('date_time', lambda p, split=_DATE_TIME_SEPARATOR.split: tuple([int(v) for v in split(p)]) if p else None),
+        'Attributes': ('mode', lambda p: p),
+        'CRC': ('CRC', lambda p: int(p, 16) if p else None),
+        'Encrypted': ('encrypted', lambda p: p),
+        'Method': ('compress_type', lambda p: p if p else None),
+        'Block': ('block', lambda p: int(p) if p else None),
+    }
 
     def execute_list(self, archive_name: str, password: Union[str, None] = None) -> Iterator[x7ZipInfo]:
-        info = None
-        for line in self.execute([
+        parsers = self._parsers
+        path_parser = parsers['Path']
+        lines = self.execute([
             self.executable,
             'l',
+            '-ba',
             '-slt',
             '-sccUTF-8',
             f"-p{password or ''}",
             archive_name,
-        ]):
-            for prefix, property_name, parse_property, prefix_length in self._parsers:
-                if not line.startswith(prefix):
-                    continue
+        ])
 
-                try:
-                    value = parse_property(line[prefix_length:])
-                except:
-                    raise x7ZipError(f'parse error: {line}')
+        # before the first entry: skip until a Path line opens a record
+        for line in lines:
+            key, separator, value = line.partition(' = ')
+            if separator and parsers.get(key) is path_parser:
+                info = x7ZipInfo(filename=value)
+                break
+        else:
+            return
 
-                if prefix == 'Path = ':
-                    if info and info.filename:
-                        yield info
+        # in a record: every Path line closes the current record and opens the next one
+        for line in lines:
+            key, separator, value = line.partition(' = ')
+            if not separator:
+                continue
 
-                    info = x7ZipInfo(filename=None if info is None else value)
+            parser = parsers.get(key)
+            if parser is None:
+                continue
 
-                if info is None:
-                    break
+            if parser is path_parser:
+                yield info
+                info = x7ZipInfo(filename=value)
+                continue
 
-                if info.filename is None:
-                    break
+            property_name, parse_property = parser
+
+            try:
+                value = parse_property(value)
+            except:
+                raise x7ZipError(f'parse error: {line}')
 
-                setattr(info, property_name, value)
+            setattr(info, property_name, value)
 
-        if info and info.filename:
-            yield info
+        yield info
 
     def execute_extract(
         self,
@@ -272,8 +302,14 @@ class _Executor:
         file_names: Union[List[str], None] = None,
         password: Union[str, None] = None,
         other_options: Union[List[str], None] = None,
+        progress: Union[Callable[[str], None], None] = None,
     ):
-        command = [self.executable, 'x', '-sccUTF-8', archive_name]
+        command = [self.executable, 'x', '-bd', '-bsp0', '-sccUTF-8', archive_name]
+
+        if progress is None:
+            command.extend(['-bb0', '-bso0'])
+        else:
+            command.extend(['-bb1', '-bso1'])
 
         if output_directory is not None:
             command.append(f'-o{output_directory}')
@@ -286,8 +322,17 @@ class _Executor:
         if other_options is not None:
             command.extend(other_options)
 
-        for _ in self.execute(command):
-            pass
+        if progress is None:
+            for _ in self.execute(command):
+                pass
+            return
+
+        lines = self.execute(command)
+        try:
+            for line in lines:
+                progress(line)
+        finally:
+            lines.close()
 
 
 _EXECUTOR: _Executor = None
@@ -300,10 +345,13 @@ def get_executor() -> _Executor:
         return _EXECUTOR
 
     for executable in _EXECUTABLES:
-        executor = _Executor(executable)
-        if executor.is_available():
-            _EXECUTOR = executor
-            return _EXECUTOR
+        path = shutil.which(executable)
+        if path is None:
+            continue
+
+        # spawn the resolved absolute path so that every later run skips the PATH search
+        _EXECUTOR = _Executor(os.path.abspath(path))
+        return _EXECUTOR
 
     raise x7ZipCannotExec(
         'Cannot find working 7-zip command. '
@@ -323,7 +371,7 @@ class x7ZipFile:
     ):
         """Open the 7-zip file with mode read 'r'.
         """
-        self._file = file if not isinstance(file, os.PathLike) else str(file)
+        self._file = os.fspath(file)
 
         if mode != 'r':
             raise NotImplementedError('x7ZipFile supports only mode=r')
@@ -334,6 +382,8 @@ class x7ZipFile:
 
         self._info_list = None
         self._info_map = None
+        self._filenames = None
+        self._members_set = None
 
     def __enter__(self) -> x7ZipInfo:
         """Open context."""
@@ -376,35 +426,67 @@ class x7ZipFile:
         """Return x7ZipInfo objects for all files/directories in archive.
         """
         if self._info_list is None:
-            self._info_list = self._executor.execute_list(self._file, password=self._pwd)
+            self._info_list = list(self._executor.execute_list(self._file, password=self._pwd))
         return self._info_list
 
-    def getinfo(self, member: str) -> x7ZipInfo:
-        """Return x7ZipInfo for file.
-        """
+    def _get_info_map(self) -> Dict[str, x7ZipInfo]:
         if self._info_map is None:
             self._info_map = {
                 info.filename: info
                 for info in self.infolist()
             }
+        return self._info_map
 
+    def getinfo(self, member: str) -> x7ZipInfo:
+        """Return x7ZipInfo for file.
+        """
         try:
-            return self._info_map[member]
+            return self._get_info_map()[member]
         except KeyError:
             raise x7ZipNoEntry(f'No such file: {member}') from None
 
+    def __contains__(self, member: Union[str, x7ZipInfo]) -> bool:
+        """Return True if file is in archive.
+        """
+        return x7ZipFile.to_filename(member) in self._get_info_map()
+
     def namelist(self) -> List[str]:
         """Return list of filenames in archive.
+
+        The list is cached and shared between calls, treat it as read-only.
+        """
+        if self._filenames is None:
+            self._filenames = [info.filename for info in self.infolist()]
+        return self._filenames
+
+    def members_set(self) -> FrozenSet[str]:
+        """Return set of filenames in archive.
+        """
+        if self._members_set is None:
+            self._members_set = frozenset(self.namelist())
+        return self._members_set
+
+    def intersection(self, names: Iterable[str]) -> FrozenSet[str]:
+        """Return filenames in archive that are also in names.
         """
-        return [info.filename for info in self.infolist()]
+        return self.members_set().intersection(names)
+
+    def difference(self, names: Iterable[str]) -> FrozenSet[str]:
+        """Return filenames in archive that are not in names.
+        """
+        return self.members_set().difference(names)
 
     @staticmethod
     def to_filename(member: Union[str, x7ZipInfo]) -> str:
         return member.filename if isinstance(member, x7ZipInfo) else member
 
-    def extract(self, member: Union[str, x7ZipInfo], path: Union[str, None] = None, pwd: Union[str, None] = None):
+    def extract(self, member: Union[str, x7ZipInfo], path: Union[str, None] = None, pwd: Union[str, None] = None, progress: Union[Callable[[str], None], None] = None):
         """Extract single file into current directory.
 
+        Each call runs 7-zip once. On solid archives that decodes the whole block
+        holding the member, so extracting files one by one costs about as much as
+        decoding the archive once per file. Use :meth:`extract_many` for several members.
+
         Parameters:
 
             member
@@ -413,18 +495,44 @@ class x7ZipFile:
                 optional destination path
             pwd
                 optional password to use
+            progress
+                optional callable that receives each line 7-zip prints
+        """
+        self.extract_many([member], path=path, pwd=pwd, progress=progress)
+
+    def extract_many(self, members: List[Union[str, x7ZipInfo]], path: Union[str, None] = None, pwd: Union[str, None] = None, progress: Union[Callable[[str], None], None] = None):
+        """Extract the given files into current directory with a single 7-zip run.
+
+        Parameters:
+
+            members
+                filename or :class:`x7ZipInfo` instance list to extract
+            path
+                optional destination path
+            pwd
+                optional password to use
+            progress
+                optional callable that receives each line 7-zip prints
         """
+        if not members:
+            # 7-zip extracts everything when no names are given
+            return
+
         self._executor.execute_extract(
             archive_name=self._file,
             output_directory=path,
-            file_names=[x7ZipFile.to_filename(member)],
+            file_names=[x7ZipFile.to_filename(member) for member in members],
             password=pwd or self._pwd,
-            other_options=['-y']
+            other_options=['-y'],
+            progress=progress,
         )
 
-    def extractall(self, path: Union[str, None] = None, members: Union[List[Union[str, x7ZipInfo]], None] = None, pwd: Union[str, None] = None):
+    def extractall(self, path: Union[str, None] = None, members: Union[List[Union[str, x7ZipInfo]], None] = None, pwd: Union[str, None] = None, progress: Union[Callable[[str], None], None] = None):
         """Extract all files into current directory.
 
+        Prefer this or :meth:`extract_many` to calling :meth:`extract` in a loop,
+        as both need only a single 7-zip run.
+
         Parameters:
 
             path
@@ -433,11 +541,14 @@ class x7ZipFile:
                 optional filename or :class:`x7ZipInfo` instance list to extract
             pwd
                 optional password to use
+            progress
+                optional callable that receives each line 7-zip prints
         """
         self._executor.execute_extract(
             archive_name=self._file,
             output_directory=path,
             file_names=[x7ZipFile.to_filename(member) for member in members] if members else None,
             password=pwd or self._pwd,
-            other_options=['-y']
+            other_options=['-y'],
+            progress=progress,
         )
@@ -2,10 +2,13 @@
 # Copyright 2021 UuuNyaa <UuuNyaa@gmail.com>
 # This file is part of x7zipfile.
 
+import contextlib
 import glob
+import io
 import os
 import shutil
 import stat
+import sys
 import tempfile
 import unittest
 
@@ -23,6 +26,11 @@ class TestCase(unittest.TestCase):
                         actual_info.needs_password()
                         actual_info.is_dir()
                         self.assertEqual(actual_info, expected_info)
+                        self.assertIn(expected_info.filename, zipfile)
+                        self.assertIn(expected_info, zipfile)
+
+                    self.assertNotIn('no such member', zipfile)
+                    self.assertNotIn(x7zipfile.x7ZipInfo(filename='no such member'), zipfile)
 
     def test_archive_extractall(self):
         for archive_name, password, error_message, expected_infolist in ARCHIVES:
@@ -65,3 +73,91 @@ class TestCase(unittest.TestCase):
                     self.assertEqual(len(expected_infos), 0)
             finally:
                 shutil.rmtree(temp_dir)
+
+    def test_archive_extract_many(self):
+        for archive_name, password, error_message, expected_infolist in ARCHIVES:
+            if error_message:
+                continue
+
+            expected_members = [info for info in expected_infolist if info.is_file() and not info.is_symlink()][:2]
+            if len(expected_members) < 2:
+                continue
+
+            temp_dir = tempfile.mkdtemp()
+            try:
+                with self.subTest(f'{archive_name} on {temp_dir}'):
+                    with x7zipfile.x7ZipFile(os.path.join(ARCHIVES_PATH, archive_name), pwd=password) as zipfile:
+                        zipfile.extract_many([], temp_dir)
+                        self.assertEqual(os.listdir(temp_dir), [])
+
+                        zipfile.extract_many(expected_members, temp_dir)
+
+                    actual_members = set()
+                    for root, _, files in os.walk(temp_dir, followlinks=False):
+                        for name in files:
+                            actual_members.add(os.path.relpath(os.path.join(root, name), temp_dir))
+
+                    self.assertEqual(actual_members, {info.filename for info in expected_members})
+            finally:
+                shutil.rmtree(temp_dir)
+
+    def test_archive_extract_progress(self):
+        for archive_name, password, error_message, expected_infolist in ARCHIVES:
+            if error_message:
+                continue
+
+            expected_files = [info.filename for info in expected_infolist if info.is_file() and not info.is_symlink()]
+
+            temp_dir = tempfile.mkdtemp()
+            try:
+                with self.subTest(f'{archive_name} on {temp_dir}'):
+                    with x7zipfile.x7ZipFile(os.path.join(ARCHIVES_PATH, archive_name), pwd=password) as zipfile:
+                        output = io.StringIO()
+                        with contextlib.redirect_stdout(output):
+                            zipfile.extractall(temp_dir)
+                        self.assertEqual(output.getvalue(), '')
+                        for expected_file in expected_files:
+                            self.assertTrue(os.path.isfile(os.path.join(temp_dir, expected_file)), expected_file)
+
+                        lines = []
+                        zipfile.extractall(temp_dir, progress=lines.append)
+                        for expected_file in expected_files:
+                            self.assertIn(f'- {expected_file}', lines)
+
+                        def stop(line):
+                            raise InterruptedError(line)
+
+                        with self.assertRaises(InterruptedError):
+                            zipfile.extractall(temp_dir, progress=stop)
+            finally:
+                shutil.rmtree(temp_dir)
+
+    def test_archive_members(self):
+        for archive_name, password, _, expected_infolist in ARCHIVES:
+            with self.subTest(archive_name):
+                with x7zipfile.x7ZipFile(os.path.join(ARCHIVES_PATH, archive_name), pwd=password) as zipfile:
+                    expected_names = {info.filename for info in expected_infolist}
+                    absent_name = 'no such member'
+
+                    members = zipfile.members_set()
+                    self.assertEqual(members, set(zipfile.namelist()))
+                    self.assertLessEqual(expected_names, members)
+
+                    self.assertEqual(zipfile.intersection(list(expected_names) + [absent_name]), expected_names)
+                    self.assertEqual(zipfile.intersection([absent_name]), set())
+                    self.assertEqual(zipfile.difference([absent_name]), members)
+                    self.assertEqual(zipfile.difference(zipfile.namelist()), set())
+                    self.assertEqual(zipfile.difference(expected_names), members - expected_names)
+
+                    for expected_info in expected_infolist:
+                        self.assertEqual(zipfile.getinfo(expected_info.filename), expected_info)
+
+                    with self.assertRaises(x7zipfile.x7ZipNoEntry):
+                        zipfile.getinfo(absent_name)
+
+    def test_execute_error_message(self):
+        executor = x7zipfile._Executor(sys.executable)
+        command = [sys.executable, '-c', "import sys; sys.stderr.buffer.write(b'\\xff bad'); sys.exit(2)"]
+        with self.assertRaisesRegex(x7zipfile.x7ZipExecError, '^Fatal error: \ufffd bad$'):
+            for _ in executor.execute(command):
+                pass